@@ -1,7 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
 import plotly.express as px
+import plotly.graph_objects as go
+import os
+import tempfile
 import warnings
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
 # ============================================================
@@ -51,41 +58,328 @@ h3 { color: #374151; }
 # ============================================================
 # FUNÇÃO DE CARREGAMENTO
 # ============================================================
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv("base_dashboard.csv")
+ARQUIVO_CSV = Path("base_dashboard.csv")
+# Versão do formato gerado por ler_csv (tipos, colunas, ordenação): incremente sempre
+# que a saída de ler_csv mudar, para que caches Parquet antigos sejam ignorados
+VERSAO_CACHE = 1
+ARQUIVO_PARQUET = ARQUIVO_CSV.with_name(f"{ARQUIVO_CSV.stem}.v{VERSAO_CACHE}.parquet")
+# Só as colunas que o painel usa são lidas: cadastro, e-mail, município etc. não
+# chegam a ser materializados, e a memória ocupada não cresce com colunas extras do CSV
+COLUNAS_USADAS = ["id_pedido", "id_cliente", "data_pedido", "quantidade", "preco_parcial",
+                  "nome_produto", "categoria", "uf", "sexo"]
+COLUNAS_DATA = ["data_pedido"]
+COLUNAS_ID = ["id_pedido", "id_cliente"]
+# Tipos finais enxutos: metade dos bytes lidos da memória nas somas e agrupamentos
+COLUNAS_NUMERICAS = {
+    "quantidade": "int32",
+    "preco_parcial": "float32",
+}
 
-        # Datas
-        for col in ["data_pedido", "data_cadastro"]:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors="coerce")
+def ler_csv():
+    # Leitura multithread no Arrow. Datas, numéricos e IDs chegam como texto e são
+    # convertidos com errors="coerce": uma célula inválida vira nulo, não derruba a carga
+    tipos = {col: pa.string() for col in COLUNAS_DATA + list(COLUNAS_NUMERICAS) + COLUNAS_ID}
+
+    tabela = pacsv.read_csv(
+        ARQUIVO_CSV,
+        convert_options=pacsv.ConvertOptions(
+            column_types=tipos,
+            include_columns=COLUNAS_USADAS,
+            null_values=["", "NA"],
+            strings_can_be_null=True,
+        ),
+    )
+    df = tabela.to_pandas(types_mapper=pd.ArrowDtype)
+
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    # Missing (float64 antes do fillna: o NaN da coerção também vira 0)
+    for col, tipo in COLUNAS_NUMERICAS.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64").fillna(0).astype(tipo)
+
+    # IDs como int64 NumPy: contagem de distintos direto sobre o array
+    for col in COLUNAS_ID:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64").fillna(0).astype("int64")
+
+    # Colunas de baixa cardinalidade como categoria (groupby por códigos inteiros)
+    for col in ["categoria", "uf", "sexo", "nome_produto"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    # Ordenado por data: o filtro de período vira uma fatia via searchsorted
+    df.sort_values("data_pedido", inplace=True, kind="stable")
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+def salvar_cache(df):
+    # Grava em arquivo temporário no mesmo diretório e troca de forma atômica: um
+    # processo interrompido ou um worker lendo em paralelo nunca vê um Parquet pela metade
+    try:
+        fd, temporario = tempfile.mkstemp(dir=ARQUIVO_PARQUET.parent,
+                                          prefix=f"{ARQUIVO_PARQUET.name}.", suffix=".tmp")
+        os.close(fd)
+    except OSError:
+        return  # sem permissão de escrita: segue apenas com o CSV
 
-        # Numéricos
-        for col in ["quantidade", "preco_parcial", "total_pedido", "preco", "estoque"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+    try:
+        df.to_parquet(temporario, engine="pyarrow", compression="zstd")
+        os.replace(temporario, ARQUIVO_PARQUET)
+    except OSError:
+        Path(temporario).unlink(missing_ok=True)
 
-        # Missing
-        df.fillna(0, inplace=True)
+@st.cache_data
+def load_data():
+    try:
+        # Parquet já tipado é reaproveitado enquanto for mais novo que o CSV e
+        # da mesma VERSAO_CACHE (embutida no nome do arquivo)
+        if (ARQUIVO_PARQUET.exists() and
+                ARQUIVO_PARQUET.stat().st_mtime >= ARQUIVO_CSV.stat().st_mtime):
+            try:
+                return pd.read_parquet(ARQUIVO_PARQUET, engine="pyarrow", columns=COLUNAS_USADAS)
+            except (OSError, pa.ArrowException):
+                pass  # cache ilegível: relê o CSV e regrava o Parquet
+
+        df = ler_csv()
+        salvar_cache(df)
         return df
 
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
         return None
 
+# ============================================================
+# FILTROS
+# ============================================================
+def opcoes(df, col, mascara):
+    # Categorias já vêm ordenadas; mantém só as presentes nas linhas da máscara,
+    # lendo os códigos inteiros sem copiar o DataFrame
+    codigos = np.unique(df[col].cat.codes.to_numpy()[mascara])
+    return df[col].cat.categories[codigos[codigos >= 0]].tolist()
+
+def mascara_selecao(df, col, valor):
+    # Compara os códigos inteiros da categoria em vez das strings
+    categorias = df[col].cat.categories
+    codigo = categorias.get_loc(valor) if valor in categorias else -2  # -1 é o código de nulo
+    return df[col].cat.codes.to_numpy() == codigo
+
+def datas_pedido(df):
+    return df["data_pedido"].to_numpy(dtype="datetime64[ns]", na_value=np.datetime64("NaT"))
+
+def indices_periodo(datas, periodo):
+    # Requer datas ordenadas (garantido em ler_csv); fim é exclusivo
+    inicio = datas.searchsorted(np.datetime64(periodo[0], "ns"), side="left")
+    fim = datas.searchsorted(np.datetime64(periodo[1], "ns"), side="right")
+    return inicio, fim
+
+def aplicar_filtros(df, periodo=None, produto="Todos", categoria="Todas", estado="Todos", sexo="Todos"):
+    if periodo is not None:
+        inicio, fim = indices_periodo(datas_pedido(df), periodo)
+        df = df.iloc[inicio:fim]
+
+    # Filtros de igualdade combinados em uma única máscara, comparando os
+    # códigos inteiros das categorias, e aplicados com uma só cópia
+    selecoes = [("nome_produto", produto, "Todos"), ("categoria", categoria, "Todas"),
+                ("uf", estado, "Todos"), ("sexo", sexo, "Todos")]
+    mascaras = [mascara_selecao(df, col, valor) for col, valor, todos in selecoes if valor != todos]
+
+    if mascaras:
+        df = df.iloc[np.logical_and.reduce(mascaras).nonzero()[0]]
+
+    return df
+
 # ============================================================
 # KPIs
 # ============================================================
 def calcular_kpis(df):
-    total_receita = df["preco_parcial"].sum()
-    total_pedidos = df["id_pedido"].nunique()
-    clientes = df["id_cliente"].nunique()
-    quantidade = df["quantidade"].sum()
+    # Acumuladores em 64 bits: o total geral não cabe com precisão em float32
+    total_receita = df["preco_parcial"].to_numpy().sum(dtype=np.float64)
+    quantidade = df["quantidade"].to_numpy().sum(dtype=np.int64)
+    total_pedidos = np.unique(df["id_pedido"].to_numpy()).size
+    clientes = np.unique(df["id_cliente"].to_numpy()).size
     ticket = total_receita / total_pedidos if total_pedidos else 0
 
     return total_receita, total_pedidos, clientes, quantidade, ticket
 
+# Somas acumuladas sobre o df ordenado por data: com só o período filtrado, receita,
+# quantidade e pedidos saem em O(1) como diferença entre duas posições.
+# "pedidos" conta a primeira linha de cada pedido, o que só vale se todas as linhas
+# de um pedido tiverem a mesma data_pedido; se não tiverem, retorna None.
+@st.cache_resource(show_spinner=False)
+def carregar_acumulados():
+    df = load_data()
+    if not df.groupby("id_pedido")["data_pedido"].nunique().max() <= 1:
+        return None
+
+    return {
+        "datas": datas_pedido(df),
+        "receita": np.concatenate(([0.0], np.cumsum(df["preco_parcial"].to_numpy(), dtype=np.float64))),
+        "quantidade": np.concatenate(([0], np.cumsum(df["quantidade"].to_numpy(), dtype=np.int64))),
+        "pedidos": np.concatenate(([0], np.cumsum(~df["id_pedido"].duplicated().to_numpy(), dtype=np.int64))),
+        "clientes": df["id_cliente"].to_numpy(),
+    }
+
+def calcular_kpis_periodo(acumulados, inicio, fim):
+    total_receita = acumulados["receita"][fim] - acumulados["receita"][inicio]
+    total_pedidos = acumulados["pedidos"][fim] - acumulados["pedidos"][inicio]
+    clientes = np.unique(acumulados["clientes"][inicio:fim]).size
+    quantidade = acumulados["quantidade"][fim] - acumulados["quantidade"][inicio]
+    ticket = total_receita / total_pedidos if total_pedidos else 0
+
+    return total_receita, total_pedidos, clientes, quantidade, ticket
+
+# Troca "," e "." em uma única passada: 1,234.56 -> 1.234,56
+TROCA_SEPARADORES = str.maketrans(",.", ".,")
+
+def moeda(x):
+    return "R$ " + f"{x:,.2f}".translate(TROCA_SEPARADORES)
+
+# ============================================================
+# AGREGAÇÕES
+# ============================================================
+def calcular_agregados(df):
+    # Receita e quantidade por dimensão via np.bincount sobre os códigos das
+    # categorias, reaproveitadas por todos os gráficos e insights. Os códigos são
+    # deslocados em 1 para que o -1 (valor ausente) caia na posição 0, descartada
+    precos = df["preco_parcial"].to_numpy(dtype=np.float64)
+    quantidades = df["quantidade"].to_numpy(dtype=np.float64)
+
+    agregados = {}
+    for col in ["categoria", "uf", "sexo", "nome_produto"]:
+        categorias = df[col].cat.categories
+        grupos = df[col].cat.codes.to_numpy() + np.intp(1)
+        n = len(categorias) + 1
+
+        linhas = np.bincount(grupos, minlength=n)[1:]
+        agregado = pd.DataFrame(
+            {
+                "preco_parcial": np.bincount(grupos, weights=precos, minlength=n)[1:],
+                "quantidade": np.bincount(grupos, weights=quantidades, minlength=n)[1:].astype(np.int64),
+            },
+            index=pd.Index(categorias, name=col),
+        )
+        # Equivale ao observed=True do groupby: só categorias presentes no recorte
+        agregados[col] = agregado[linhas > 0]
+
+    codigos, pedidos = pd.factorize(df["id_pedido"].to_numpy(), sort=False)
+    agregados["id_pedido"] = pd.Series(
+        np.bincount(codigos, weights=df["preco_parcial"].to_numpy(), minlength=len(pedidos)),
+        index=pd.Index(pedidos, name="id_pedido"),
+        name="preco_parcial",
+    )
+    # Série temporal diária, reamostrada por semana quando passaria de ~500 pontos no gráfico
+    receita_diaria = df.groupby(df["data_pedido"].dt.date)["preco_parcial"].sum()
+    if len(receita_diaria) > 500:
+        receita_diaria.index = pd.to_datetime(receita_diaria.index)
+        receita_diaria = receita_diaria.resample("W").sum().rename_axis("data_pedido")
+    agregados["data_pedido"] = receita_diaria
+
+    return agregados
+
+# Limite de combinações de filtros guardadas por cache: cada período distinto gera
+# uma entrada (~400 KB com a base completa), então sem teto a memória só cresce
+MAX_PAINEIS_EM_CACHE = 64
+
+# Cache indexado apenas pelos valores dos filtros (escalares baratos de hashear):
+# reruns que não alteram os filtros reaproveitam KPIs e agregações prontos
+@st.cache_data(show_spinner=False, max_entries=MAX_PAINEIS_EM_CACHE)
+def calcular_painel(periodo, produto, categoria, estado, sexo):
+    df = load_data()
+
+    so_periodo = (produto, categoria, estado, sexo) == ("Todos", "Todas", "Todos", "Todos")
+    acumulados = carregar_acumulados() if so_periodo else None
+
+    if acumulados is not None:
+        # Só o período filtrado: KPIs pelas somas acumuladas
+        inicio, fim = indices_periodo(acumulados["datas"], periodo) if periodo else (0, len(df))
+        df = df.iloc[inicio:fim]
+        return calcular_kpis_periodo(acumulados, inicio, fim), calcular_agregados(df)
+
+    df = aplicar_filtros(df, periodo, produto, categoria, estado, sexo)
+    return calcular_kpis(df), calcular_agregados(df)
+
+# ============================================================
+# FIGURAS
+# ============================================================
+# Layout e opções fixos montados uma só vez; theme=None dispensa a aplicação
+# do tema do Streamlit sobre cada figura
+LAYOUT_GRAFICO = dict(height=400, title_font_size=16, margin=dict(l=40, r=20, t=40, b=40))
+OPCOES_GRAFICO = dict(width="stretch", theme=None, config={"displaylogo": False})
+
+# Figuras já serializadas em dict, em cache pelos mesmos filtros do painel:
+# reruns e trocas de aba com os filtros inalterados não remontam nem validam as figuras
+@st.cache_data(show_spinner=False, max_entries=MAX_PAINEIS_EM_CACHE)
+def graficos_visao_geral(filtros):
+    _, agregados = calcular_painel(*filtros)
+
+    # Receita ao longo do tempo
+    receita_data = agregados["data_pedido"].reset_index()
+
+    fig = px.line(
+        receita_data,
+        x="data_pedido",
+        y="preco_parcial",
+        title="Receita ao Longo do Tempo",
+        markers=True
+    )
+    fig.update_layout(**LAYOUT_GRAFICO)
+
+    # Receita por categoria
+    cat = agregados["categoria"]["preco_parcial"].reset_index()
+
+    fig2 = px.bar(cat, x="categoria", y="preco_parcial", title="Receita por Categoria")
+    fig2.update_layout(**LAYOUT_GRAFICO)
+
+    return fig.to_dict(), fig2.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=MAX_PAINEIS_EM_CACHE)
+def graficos_produtos(filtros):
+    _, agregados = calcular_painel(*filtros)
+
+    # Top receita
+    top = agregados["nome_produto"]["preco_parcial"].nlargest(10).reset_index()
+
+    fig3 = px.bar(top, x="preco_parcial", y="nome_produto", orientation="h",
+                  title="Top 10 Produtos por Receita")
+    fig3.update_layout(**LAYOUT_GRAFICO)
+
+    # Top quantidade
+    qtd = agregados["nome_produto"]["quantidade"].nlargest(10).reset_index()
+
+    fig4 = px.bar(qtd, x="quantidade", y="nome_produto", orientation="h",
+                  title="Top 10 Produtos por Quantidade")
+    fig4.update_layout(**LAYOUT_GRAFICO)
+
+    return fig3.to_dict(), fig4.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=MAX_PAINEIS_EM_CACHE)
+def graficos_estados_clientes(filtros):
+    _, agregados = calcular_painel(*filtros)
+
+    # Receita por estado
+    estado_df = agregados["uf"]["preco_parcial"].reset_index()
+
+    fig5 = px.bar(estado_df, x="uf", y="preco_parcial", title="Receita por Estado")
+    fig5.update_layout(**LAYOUT_GRAFICO)
+
+    # Receita por sexo
+    sexo_df = agregados["sexo"]["preco_parcial"].reset_index()
+
+    fig6 = px.pie(sexo_df, names="sexo", values="preco_parcial", title="Receita por Sexo", hole=0.4)
+    fig6.update_layout(**LAYOUT_GRAFICO)
+
+    # Distribuição pedidos (bins calculados no servidor: envia 40 barras, não um ponto por pedido)
+    contagens, bordas = np.histogram(agregados["id_pedido"].to_numpy(), bins=40)
+
+    fig7 = go.Figure(go.Bar(x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, width=np.diff(bordas)))
+    fig7.update_layout(title="Distribuição de Valores de Pedido", bargap=0,
+                       xaxis_title="preco_parcial", yaxis_title="count", **LAYOUT_GRAFICO)
+
+    return fig5.to_dict(), fig6.to_dict(), fig7.to_dict()
+
 # ============================================================
 # APP PRINCIPAL
 # ============================================================
@@ -105,6 +399,7 @@ def main():
 
     st.sidebar.header("🔎 Filtros")
 
+    periodo = None
     if "data_pedido" in df.columns:
         data = st.sidebar.date_input(
             "Período",
@@ -112,27 +407,31 @@ def main():
         )
 
         if len(data) == 2:
-            df = df[(df["data_pedido"] >= pd.to_datetime(data[0])) &
-                    (df["data_pedido"] <= pd.to_datetime(data[1]))]
+            periodo = (data[0], data[1])
+            df = aplicar_filtros(df, periodo=periodo)
+
+    # Filtros em cascata sobre uma única máscara acumulada: cada seleção restringe as
+    # opções da seguinte sem copiar o DataFrame (a fatia do período é uma view)
+    mascara = np.ones(len(df), dtype=bool)
 
-    produto = st.sidebar.selectbox("Produto", ["Todos"] + sorted(df["nome_produto"].unique()))
+    produto = st.sidebar.selectbox("Produto", ["Todos"] + opcoes(df, "nome_produto", mascara))
     if produto != "Todos":
-        df = df[df["nome_produto"] == produto]
+        mascara &= mascara_selecao(df, "nome_produto", produto)
 
-    categoria = st.sidebar.selectbox("Categoria", ["Todas"] + sorted(df["categoria"].unique()))
+    categoria = st.sidebar.selectbox("Categoria", ["Todas"] + opcoes(df, "categoria", mascara))
     if categoria != "Todas":
-        df = df[df["categoria"] == categoria]
+        mascara &= mascara_selecao(df, "categoria", categoria)
 
-    estado = st.sidebar.selectbox("Estado", ["Todos"] + sorted(df["uf"].unique()))
+    estado = st.sidebar.selectbox("Estado", ["Todos"] + opcoes(df, "uf", mascara))
     if estado != "Todos":
-        df = df[df["uf"] == estado]
+        mascara &= mascara_selecao(df, "uf", estado)
 
-    sexo = st.sidebar.selectbox("Sexo", ["Todos"] + sorted(df["sexo"].unique()))
+    sexo = st.sidebar.selectbox("Sexo", ["Todos"] + opcoes(df, "sexo", mascara))
     if sexo != "Todos":
-        df = df[df["sexo"] == sexo]
+        mascara &= mascara_selecao(df, "sexo", sexo)
 
     st.sidebar.markdown("---")
-    st.sidebar.info(f"Registros filtrados: {len(df):,}")
+    st.sidebar.info(f"Registros filtrados: {int(mascara.sum()):,}")
 
 # ============================================================
 # KPIs VISUAIS
@@ -140,10 +439,8 @@ def main():
 
     st.subheader("Indicadores Principais")
 
-    total_receita, total_pedidos, clientes, quantidade, ticket = calcular_kpis(df)
-
-    def moeda(x):
-        return f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    kpis, agregados = calcular_painel(periodo, produto, categoria, estado, sexo)
+    total_receita, total_pedidos, clientes, quantidade, ticket = kpis
 
     c1, c2, c3, c4, c5 = st.columns(5)
 
@@ -160,57 +457,34 @@ def main():
     st.divider()
     st.subheader("Visualizações")
 
-    # Receita ao longo do tempo
-    receita_data = df.groupby(df["data_pedido"].dt.date)["preco_parcial"].sum().reset_index()
-
-    fig = px.line(
-        receita_data,
-        x="data_pedido",
-        y="preco_parcial",
-        title="Receita ao Longo do Tempo",
-        markers=True
+    # Abas com estado: só os gráficos da aba aberta são montados a cada rerun
+    aba_geral, aba_produtos, aba_regioes = st.tabs(
+        ["Visão Geral", "Produtos", "Estados e Clientes"],
+        key="aba_graficos",
+        on_change="rerun",
     )
-    st.plotly_chart(fig, use_container_width=True)
-
-    # Receita por categoria
-    cat = df.groupby("categoria")["preco_parcial"].sum().reset_index()
-
-    fig2 = px.bar(cat, x="categoria", y="preco_parcial", title="Receita por Categoria")
-    st.plotly_chart(fig2, use_container_width=True)
-
-    col1, col2 = st.columns(2)
-
-    # Top receita
-    top = df.groupby("nome_produto")["preco_parcial"].sum().sort_values(ascending=False).head(10).reset_index()
-
-    fig3 = px.bar(top, x="preco_parcial", y="nome_produto", orientation="h",
-                  title="Top 10 Produtos por Receita")
-    col1.plotly_chart(fig3, use_container_width=True)
 
-    # Top quantidade
-    qtd = df.groupby("nome_produto")["quantidade"].sum().sort_values(ascending=False).head(10).reset_index()
+    filtros = (periodo, produto, categoria, estado, sexo)
 
-    fig4 = px.bar(qtd, x="quantidade", y="nome_produto", orientation="h",
-                  title="Top 10 Produtos por Quantidade")
-    col2.plotly_chart(fig4, use_container_width=True)
-
-    # Receita por estado
-    estado_df = df.groupby("uf")["preco_parcial"].sum().reset_index()
-
-    fig5 = px.bar(estado_df, x="uf", y="preco_parcial", title="Receita por Estado")
-    st.plotly_chart(fig5, use_container_width=True)
-
-    # Receita por sexo
-    sexo_df = df.groupby("sexo")["preco_parcial"].sum().reset_index()
-
-    fig6 = px.pie(sexo_df, names="sexo", values="preco_parcial", title="Receita por Sexo", hole=0.4)
-    st.plotly_chart(fig6, use_container_width=True)
+    with aba_geral:
+        if aba_geral.open:
+            fig, fig2 = graficos_visao_geral(filtros)
+            st.plotly_chart(fig, **OPCOES_GRAFICO)
+            st.plotly_chart(fig2, **OPCOES_GRAFICO)
 
-    # Distribuição pedidos
-    pedidos = df.groupby("id_pedido")["preco_parcial"].sum().reset_index()
+    with aba_produtos:
+        if aba_produtos.open:
+            col1, col2 = st.columns(2)
+            fig3, fig4 = graficos_produtos(filtros)
+            col1.plotly_chart(fig3, **OPCOES_GRAFICO)
+            col2.plotly_chart(fig4, **OPCOES_GRAFICO)
 
-    fig7 = px.histogram(pedidos, x="preco_parcial", nbins=40, title="Distribuição de Valores de Pedido")
-    st.plotly_chart(fig7, use_container_width=True)
+    with aba_regioes:
+        if aba_regioes.open:
+            fig5, fig6, fig7 = graficos_estados_clientes(filtros)
+            st.plotly_chart(fig5, **OPCOES_GRAFICO)
+            st.plotly_chart(fig6, **OPCOES_GRAFICO)
+            st.plotly_chart(fig7, **OPCOES_GRAFICO)
 
 # ============================================================
 # INSIGHTS AUTOMÁTICOS
@@ -222,15 +496,15 @@ def main():
     col1, col2, col3 = st.columns(3)
 
     # Produto mais vendido
-    produto_top = df.groupby("nome_produto")["quantidade"].sum().idxmax()
+    produto_top = agregados["nome_produto"]["quantidade"].idxmax()
     col1.success(f"Produto mais vendido:\n**{produto_top}**")
 
     # Categoria mais lucrativa
-    cat_top = df.groupby("categoria")["preco_parcial"].sum().idxmax()
+    cat_top = agregados["categoria"]["preco_parcial"].idxmax()
     col2.info(f"Categoria mais lucrativa:\n**{cat_top}**")
 
     # Estado líder
-    estado_top = df.groupby("uf")["preco_parcial"].sum().idxmax()
+    estado_top = agregados["uf"]["preco_parcial"].idxmax()
     col3.warning(f"Estado com maior receita:\n**{estado_top}**")
 
 # ============================================================